@@ -1,5 +1,6 @@
 import atexit
 import contextlib
+import importlib
 import os
 import pathlib
 import requests
@@ -48,6 +49,23 @@ def env(**kwargs):
                 os.environ[key] = value
 
 
+def import_app():
+    import ghia
+    importlib.reload(ghia)  # force reload (config could change)
+    if hasattr(ghia, 'app'):
+        return ghia.app
+    elif hasattr(ghia, 'create_app'):
+        return ghia.create_app(None)
+    else:
+        raise RuntimeError(
+            "Can't find a Flask app. "
+            "Either instantiate `ghia.app` variable "
+            "or implement `ghia.create_app(dummy)` function. "
+            "See https://flask.palletsprojects.com/en/1.1.x/patterns/appfactories/"
+            "for additional information."
+        )
+
+
 def contains_exactly(items, lst):
     return len(items) == len(lst) and all(i in lst for i in items)
 
@@ -0,0 +1,359 @@
+"""Signed webhook load generator for the ghia receiver.
+
+Builds realistic ``issues`` deliveries from the tests_environment/issues
+corpus, signs them like GitHub does and sends them at a target rate
+either to the Flask app in-process (GHIA_CONFIG must be set) or to any URL.
+
+In-process, outgoing GitHub issue API calls made through requests are
+answered by a local stand-in, so the receiver can be measured without
+touching (or rate limiting) the real repositories. Other calls (e.g. the
+username lookup of the app) still go to GitHub, so the auth config needs
+a real token. The app is loaded through tests/helpers.py, which needs
+GITHUB_USER and GITHUB_TOKEN set just like the tests do.
+
+    $ export GHIA_CONFIG=auth.cfg:rules.cfg
+    $ python tests/loadgen.py --config-auth auth.cfg --rate 50 --duration 10
+    $ python tests/loadgen.py --config-auth auth.cfg --url http://localhost:5000/
+"""
+import argparse
+import concurrent.futures
+import configparser
+import contextlib
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import pathlib
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+
+ENVIRONMENT = pathlib.Path(__file__).parent.parent / 'tests_environment'
+ACTIONS = ('opened', 'edited', 'labeled', 'assigned', 'reopened')
+ISSUES_API = re.compile(r'https://api\.github\.com/repos/[^/]+/[^/]+/issues')
+ISSUE_URL = re.compile(r'/repos/([^/]+/[^/]+)/issues(?:/(\d+))?/?(?:\?|$)')
+SUBRESOURCE_URL = re.compile(r'/repos/([^/]+/[^/]+)/issues/(\d+)/(labels|assignees)'
+                             r'(?:/([^/?]+))?/?(?:\?|$)')
+SETUP_ISSUE = re.compile(r'hub issue create -F \.\./issues/issue\.(\d+)\.txt(.*)$')
+
+
+def corpus(environment=ENVIRONMENT):
+    labels, assignees = {}, {}
+    for line in (environment / 'setup.sh').read_text().splitlines():
+        match = SETUP_ISSUE.match(line.strip())
+        if match:
+            number = int(match.group(1))
+            labels[number] = re.findall(r'-l"([^"]*)"', match.group(2))
+            assignees[number] = re.findall(r'-a"([^"]*)"', match.group(2))
+    issues = []
+    for path in sorted((environment / 'issues').glob('issue.*.txt')):
+        number = int(path.name.split('.')[1])
+        title, _, body = path.read_text().partition('\n')
+        issues.append({
+            'number': number,
+            'title': title.strip(),
+            'body': body.strip(),
+            'labels': labels.get(number, []),
+            'assignees': assignees.get(number, []),
+        })
+    return issues
+
+
+def delivery(issue, reposlug, action, sender='ghia-loadgen'):
+    # labeled/assigned only make sense for issues that have some
+    if action == 'labeled' and not issue['labels']:
+        action = 'edited'
+    elif action == 'assigned' and not issue['assignees']:
+        action = 'edited'
+    url = f'https://api.github.com/repos/{reposlug}/issues/{issue["number"]}'
+    payload = {
+        'action': action,
+        'issue': {
+            'url': url,
+            'html_url': f'https://github.com/{reposlug}/issues/{issue["number"]}',
+            'number': issue['number'],
+            'title': issue['title'],
+            'body': issue['body'],
+            'state': 'open',
+            'labels': [{'name': label} for label in issue['labels']],
+            'assignees': [{'login': login} for login in issue['assignees']],
+        },
+        'repository': {
+            'full_name': reposlug,
+            'name': reposlug.split('/')[1],
+            'private': False,
+        },
+        'sender': {
+            'login': sender,
+        },
+    }
+    if action == 'labeled':
+        payload['label'] = {'name': issue['labels'][-1]}
+    elif action == 'assigned':
+        payload['assignee'] = {'login': issue['assignees'][-1]}
+    return payload
+
+
+def deliveries(reposlug, environment=ENVIRONMENT):
+    issues = corpus(environment)
+    for n, (issue, action) in enumerate(zip(itertools.cycle(issues),
+                                            itertools.cycle(ACTIONS))):
+        yield n, delivery(issue, reposlug, action)
+
+
+def read_secret(auth_config):
+    cfg = configparser.ConfigParser()
+    cfg.read(auth_config)
+    return cfg.get('github', 'secret', fallback=None)
+
+
+def headers(data, n, secret):
+    result = {
+        'Content-Type': 'application/json',
+        'X-GitHub-Event': 'issues',
+        'X-GitHub-Delivery': f'loadgen-{n}',
+    }
+    if secret is not None:
+        digest = hmac.new(secret.encode(), data, hashlib.sha1).hexdigest()
+        result['X-Hub-Signature'] = f'sha1={digest}'
+    return result
+
+
+class GitHubStandIn:
+
+    def __init__(self, issues):
+        self.issues = {issue['number']: issue for issue in issues}
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def issue(self, reposlug, number, changes=None):
+        payload = delivery(self.issues[number], reposlug, 'opened')['issue']
+        changes = dict(changes or {})
+        if 'assignee' in changes:
+            assignee = changes.pop('assignee')
+            changes.setdefault('assignees', [assignee] if assignee else [])
+        if 'assignees' in changes:
+            changes['assignees'] = [{'login': login} for login in changes['assignees']]
+        if 'labels' in changes:
+            changes['labels'] = [label if isinstance(label, dict) else {'name': label}
+                                 for label in changes['labels']]
+        payload.update(changes)
+        return payload
+
+    def subresource(self, request, reposlug, number, kind, name):
+        body = json.loads(request.body) if request.body else {}
+        issue = self.issue(reposlug, number)
+        if kind == 'labels':
+            labels = issue['labels']
+            if isinstance(body, dict):
+                body = body.get('labels', [])
+            added = [label if isinstance(label, dict) else {'name': label}
+                     for label in body]
+            if request.method == 'POST' and name is None:
+                return 200, labels + [label for label in added if label not in labels]
+            if request.method == 'PUT' and name is None:
+                return 200, added
+            if request.method == 'DELETE' and name is None:
+                return 204, None
+            name = urllib.parse.unquote(name)
+            if request.method == 'DELETE' and any(label['name'] == name for label in labels):
+                return 200, [label for label in labels if label['name'] != name]
+        elif name is None and request.method in ('POST', 'DELETE'):
+            logins = [a['login'] for a in issue['assignees']]
+            changed = body.get('assignees', []) if isinstance(body, dict) else []
+            if request.method == 'POST':
+                logins += [login for login in changed if login not in logins]
+                return 201, self.issue(reposlug, number, {'assignees': logins})
+            logins = [login for login in logins if login not in changed]
+            return 200, self.issue(reposlug, number, {'assignees': logins})
+        return 404, {'message': 'Not Found'}
+
+    def respond(self, request):
+        import requests
+        status, payload = 404, {'message': 'Not Found'}
+        match = ISSUE_URL.search(request.url)
+        sub = SUBRESOURCE_URL.search(request.url)
+        if match and match.group(2) is None:
+            if request.method == 'GET':
+                status, payload = 200, []
+        elif match and int(match.group(2)) in self.issues:
+            reposlug, number = match.group(1), int(match.group(2))
+            if request.method == 'GET':
+                status, payload = 200, self.issue(reposlug, number)
+            elif request.method == 'PATCH':
+                changes = json.loads(request.body) if request.body else {}
+                if isinstance(changes, dict):
+                    status, payload = 200, self.issue(reposlug, number, changes)
+                else:
+                    status, payload = 422, {'message': 'Invalid request.'}
+        elif sub and int(sub.group(2)) in self.issues:
+            status, payload = self.subresource(request, sub.group(1), int(sub.group(2)),
+                                               sub.group(3), sub.group(4))
+        with self.lock:
+            key = (request.method, status)
+            self.calls[key] = self.calls.get(key, 0) + 1
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        if payload is not None:
+            response.headers['Content-Type'] = 'application/json'
+            response._content = json.dumps(payload).encode()
+        else:
+            response._content = b''
+        return response
+
+    @contextlib.contextmanager
+    def installed(self):
+        from requests.adapters import HTTPAdapter
+        original = HTTPAdapter.send
+
+        def send(adapter, request, *args, **kwargs):
+            if ISSUES_API.match(request.url):
+                return self.respond(request)
+            return original(adapter, request, *args, **kwargs)
+
+        HTTPAdapter.send = send
+        try:
+            yield self
+        finally:
+            HTTPAdapter.send = original
+
+
+def load_app():
+    from helpers import import_app
+    app = import_app()
+    app.config['TESTING'] = True
+    return app
+
+
+def app_sender(app):
+    local = threading.local()
+
+    def send(data, hdrs):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return local.client.post('/', data=data, headers=hdrs).status_code
+    return send
+
+
+def url_sender(url, timeout=10):
+    import requests
+    local = threading.local()
+
+    def send(data, hdrs):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session.post(url, data=data, headers=hdrs,
+                                  timeout=timeout).status_code
+    return send
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = max(0, math.ceil(p / 100 * len(values)) - 1)  # nearest rank
+    return values[k]
+
+
+def run_load(send, reposlug, secret, rate, duration, workers=16):
+    """Send deliveries at ``rate`` per second for ``duration`` seconds
+
+    The schedule is open-loop: a slow receiver does not lower the offered
+    rate. Latency is measured from the scheduled send time, so time spent
+    waiting for a free worker is included.
+    """
+    latencies, statuses, errors = [], {}, []
+    lock = threading.Lock()
+
+    def fire(n, payload, scheduled):
+        data = json.dumps(payload).encode()
+        try:
+            status = send(data, headers(data, n, secret))
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    total = max(1, int(rate * duration))
+    begin = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for n, payload in itertools.islice(deliveries(reposlug), total):
+            scheduled = begin + n / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, n, payload, scheduled)
+    wall = time.perf_counter() - begin
+
+    accepted = sum(count for status, count in statuses.items() if 200 <= status < 300)
+    return {
+        'sent': total,
+        'accepted': accepted,
+        'rejected': sum(statuses.values()) - accepted,
+        'failed': len(errors),
+        'error_rate': (total - accepted) / total,
+        'offered_rate': rate,
+        'accepted_rate': accepted / wall,
+        'wall': wall,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p90': percentile(latencies, 90),
+        'latency_p99': percentile(latencies, 99),
+        'latency_max': max(latencies, default=0.0),
+        'latency_mean': statistics.mean(latencies) if latencies else 0.0,
+        'statuses': statuses,
+    }
+
+
+def report(result, github_calls=None, file=sys.stdout):
+    print(f'sent      {result["sent"]} in {result["wall"]:.2f} s '
+          f'(offered {result["offered_rate"]:.1f}/s)', file=file)
+    print(f'accepted  {result["accepted"]} ({result["accepted_rate"]:.1f}/s), '
+          f'rejected {result["rejected"]}, failed {result["failed"]}, '
+          f'error rate {result["error_rate"]:.2%}', file=file)
+    print('latency   ' + ', '.join(
+        f'{name} {result["latency_" + name] * 1000:.1f} ms'
+        for name in ('p50', 'p90', 'p99', 'max')), file=file)
+    if github_calls is not None:
+        calls = ', '.join(f'{method} {status}: {count}'
+                          for (method, status), count in sorted(github_calls.items()))
+        print(f'github    {calls or "no calls"}', file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='loadgen',
+                                     description='Signed webhook load generator for ghia')
+    parser.add_argument('-a', '--config-auth', required=True,
+                        help='Auth config whose [github] secret signs the deliveries.')
+    parser.add_argument('-u', '--url',
+                        help='Receiver URL (default: ghia app in-process, needs GHIA_CONFIG).')
+    parser.add_argument('--reposlug', default='mi-pyt-ghia/loadgen')
+    parser.add_argument('--rate', type=float, default=20.0, help='Deliveries per second.')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds of load.')
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    secret = read_secret(args.config_auth)
+    if args.url:
+        result = run_load(url_sender(args.url), args.reposlug, secret,
+                          args.rate, args.duration, args.workers)
+        report(result)
+    else:
+        with GitHubStandIn(corpus()).installed() as github:
+            result = run_load(app_sender(load_app()), args.reposlug, secret,
+                              args.rate, args.duration, args.workers)
+        report(result, github.calls)
+    return 0 if result['error_rate'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import loadgen
+
+from helpers import env, config
+
+config_env = f'{config("auth.real.cfg")}:{config("rules.match_any.cfg")}'
+
+
+def test_corpus_deliveries():
+    issues = {issue['number']: issue for issue in loadgen.corpus()}
+    assert issues[1]['title'] == 'Wild error appears'
+    assert issues[11]['labels'] == ['Python', 'regex', 'matching']
+    assert issues[7]['assignees'] == ['ghia-anna', 'ghia-john']
+    n, payload = next(loadgen.deliveries('mi-pyt-ghia/loadgen'))
+    assert payload['action'] == 'opened'
+    assert payload['issue']['html_url'] == 'https://github.com/mi-pyt-ghia/loadgen/issues/1'
+
+
+def test_assigned_delivery_has_assignee():
+    issue = {issue['number']: issue for issue in loadgen.corpus()}[8]
+    payload = loadgen.delivery(issue, 'mi-pyt-ghia/loadgen', 'assigned')
+    assert payload['assignee'] in payload['issue']['assignees']
+
+
+def test_percentile_nearest_rank():
+    assert loadgen.percentile([1, 2, 3, 4, 5], 50) == 3
+    assert loadgen.percentile(range(1, 11), 25) == 3
+    assert loadgen.percentile(range(1, 11), 100) == 10
+
+
+def test_signed_deliveries_throughput():
+    secret = loadgen.read_secret(config('auth.real.cfg'))
+    with env(GHIA_CONFIG=config_env):
+        with loadgen.GitHubStandIn(loadgen.corpus()).installed() as github:
+            result = loadgen.run_load(loadgen.app_sender(loadgen.load_app()),
+                                      'mi-pyt-ghia/loadgen', secret,
+                                      rate=20, duration=2)
+    loadgen.report(result, github.calls)
+    assert result['accepted'] == result['sent']
+    assert result['error_rate'] == 0
+    # any:[PJC]ython and any:lang(?:uage)? match part of the corpus
+    assert sum(count for (method, _), count in github.calls.items()
+               if method in ('PATCH', 'POST', 'PUT')) > 0
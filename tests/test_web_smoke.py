@@ -1,38 +1,20 @@
 import flask
-import importlib
 
-from helpers import env, config, user
+from helpers import env, config, user, import_app
 
 config_env = f'{config("auth.real.cfg")}:{config("rules.empty.cfg")}'
 config_env_nosecret = f'{config("auth.no-secret.real.cfg")}:{config("rules.empty.cfg")}'
 
 
-def _import_app():
-    import ghia
-    importlib.reload(ghia)  # force reload (config could change)
-    if hasattr(ghia, 'app'):
-        return ghia.app
-    elif hasattr(ghia, 'create_app'):
-        return ghia.create_app(None)
-    else:
-        raise RuntimeError(
-            "Can't find a Flask app. "
-            "Either instantiate `ghia.app` variable "
-            "or implement `ghia.create_app(dummy)` function. "
-            "See https://flask.palletsprojects.com/en/1.1.x/patterns/appfactories/"
-            "for additional information."
-        )
-
-
 def _test_app():
-    app = _import_app()
+    app = import_app()
     app.config['TESTING'] = True
     return app.test_client()
 
 
 def test_app_imports():
     with env(GHIA_CONFIG=config_env):
-        app = _import_app()
+        app = import_app()
         assert isinstance(app, flask.Flask)
 
 